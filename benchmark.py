@@ -0,0 +1,291 @@
+"""Throughput benchmark for bot.py against a local chain
+
+Runs the deploy and interact phases of the automated workflow against an
+in-process eth-tester/py-evm chain served over HTTP JSON-RPC, or against a
+local node (e.g. `anvil --chain-id 121214`) via --rpc-url. Results are
+appended to benchmark_results.jsonl so regressions show up between runs.
+
+    pip install "eth-tester[py-evm]"
+    python benchmark.py --pairs 5 --interactions 100 --rounds 3
+
+With --ws, new blocks reach the bot over a scripted newHeads WebSocket
+stand-in for the in-process chain; --ws-url points at a node's own endpoint.
+
+With --startup it instead times a cold `import bot` and a session that
+connects directly to the chain, opens the account status from the menu
+and exits, each in a fresh interpreter.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import contextlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import bot
+
+RESULTS_FILE = "benchmark_results.jsonl"
+
+# ================== LOCAL DEVNET ==================
+def to_wire(value):
+    """Encode eth-tester results the way a JSON-RPC node would"""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if hasattr(value, "items"):
+        return {to_camel(k): to_wire(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_wire(v) for v in value]
+    return value
+
+def to_camel(key):
+    head, *rest = key.split("_")
+    return head + "".join(word.title() for word in rest)
+
+def start_devnet():
+    """Serve an eth-tester chain over HTTP JSON-RPC, returns (url, private key, head getter)"""
+    from web3 import Web3, EthereumTesterProvider
+
+    provider = EthereumTesterProvider()
+    chain = Web3(provider)
+    lock = threading.Lock()
+
+    def handle(request):
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        with lock:
+            try:
+                response["result"] = to_wire(chain.manager.request_blocking(request["method"], request.get("params", [])))
+            except Exception as e:
+                error = (getattr(e, "rpc_response", None) or {}).get("error")
+                response["error"] = error or {"code": -32000, "message": str(e)}
+        return response
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            result = [handle(r) for r in body] if isinstance(body, list) else handle(body)
+            data = json.dumps(result).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    private_key = provider.ethereum_tester.backend.account_keys[0]
+
+    def head():
+        with lock:
+            return chain.eth.block_number
+
+    return f"http://127.0.0.1:{server.server_port}", private_key.to_hex(), head
+
+def start_head_feed(head, interval=0.01):
+    """Scripted newHeads stand-in: answer eth_subscribe, then push each new head number"""
+    from websockets.sync.server import serve
+    from websockets.exceptions import ConnectionClosed
+
+    def handler(ws):
+        subscription = "0x1"
+        try:
+            request = json.loads(ws.recv())
+            ws.send(json.dumps({"jsonrpc": "2.0", "id": request.get("id"), "result": subscription}))
+            last = None
+            while True:
+                number = head()
+                if number != last:
+                    last = number
+                    ws.send(json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                                        "params": {"subscription": subscription, "result": {"number": hex(number)}}}))
+                time.sleep(interval)
+        except ConnectionClosed:
+            pass
+
+    server = serve(handler, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"ws://127.0.0.1:{server.socket.getsockname()[1]}"
+
+# ================== INSTRUMENTATION ==================
+STAGES = {
+    "compile": "compile_seconds",
+    "build": "build_seconds",
+    "sign": "sign_seconds",
+    "send": "send_seconds",
+    "wait": "pipeline_wait_seconds",
+    "backoff": "backoff_seconds",
+}
+
+def snapshot():
+    """Stage seconds, RPC calls and round-trips from bot.metrics"""
+    seconds = {stage: bot.metrics.total_seconds(name) for stage, name in STAGES.items()}
+    return seconds, bot.metrics.total_count("rpc_requests_total"), bot.metrics.total_count("rpc_round_trips_total")
+
+def percentile(values, fraction):
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+# ================== STARTUP ==================
+def time_startup(runs, rpc_url, private_key):
+    """Median seconds for a bare interpreter, `import bot`, and menu -> status -> exit on rpc_url"""
+    script = os.path.abspath(bot.__file__)
+    # The menu only reports on an existing connection, so open a direct one first
+    menu = f"import bot; bot.NETWORK_CONFIG['rpcUrl'] = {rpc_url!r}; bot.create_web3_connection(); bot.main()"
+    sessions = {
+        "python": ([sys.executable, "-c", "pass"], ""),
+        "import bot": ([sys.executable, "-c", "import bot"], ""),
+        "menu + status": ([sys.executable, "-c", menu], "1\n\n0\n"),
+    }
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(script), TERM="dumb")
+    workdir = tempfile.mkdtemp()  # No journal or proxy.txt to pick up, only the account
+    with open(os.path.join(workdir, "accounts.txt"), "w") as f:
+        f.write(private_key + "\n")
+    results = {}
+    for label, (command, stdin) in sessions.items():
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(command, input=stdin, text=True, cwd=workdir, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            samples.append(time.perf_counter() - started)
+        results[label] = sorted(samples)[len(samples) // 2]
+    return results
+
+# ================== BENCHMARK ==================
+def run_round(account, pairs, interactions, batch_size, verbose):
+    """One deploy + interact workflow run, returns its measurements"""
+    run_id = bot.journal.start_run(pairs, interactions, batch_size)
+    bot.receipt_tracker.latencies.clear()
+    stage_before, calls_before, trips_before = snapshot()
+
+    started = time.perf_counter()
+    cpu_started = time.thread_time()  # Devnet and receipt polling run on other threads
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        completed = bot.run_workflow(account, run_id)
+    cpu = time.thread_time() - cpu_started
+    elapsed = time.perf_counter() - started
+
+    stage_after, calls_after, trips_after = snapshot()
+    latencies = list(bot.receipt_tracker.latencies.values())
+    transactions = len(latencies)
+    return {
+        "pairs": pairs,
+        "interactions": interactions,
+        "batch_size": batch_size,
+        "transactions": transactions,
+        "seconds": round(elapsed, 3),
+        "tx_per_sec": round(transactions / elapsed, 2) if elapsed else 0.0,
+        "interactions_per_sec": round(completed / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "rpc_calls_per_tx": round((calls_after - calls_before) / max(transactions, 1), 2),
+        "round_trips_per_tx": round((trips_after - trips_before) / max(transactions, 1), 2),
+        "cpu_ms_per_tx": round(cpu / max(transactions, 1) * 1000, 2),
+        "stage_seconds": {stage: round(stage_after.get(stage, 0.0) - stage_before.get(stage, 0.0), 3) for stage in stage_after},
+    }
+
+def print_result(result, previous):
+    print(f"   Transactions: {result['transactions']} in {result['seconds']:.2f}s → {result['tx_per_sec']:.2f} tx/s, "
+          f"{result['interactions_per_sec']:.2f} interactions/s")
+    print(f"   Latency:      p50 {result['latency_p50_ms']:.0f} ms, p95 {result['latency_p95_ms']:.0f} ms")
+    print(f"   RPC:          {result['rpc_calls_per_tx']:.2f} calls/tx in {result['round_trips_per_tx']:.2f} round-trips/tx")
+    print(f"   CPU:          {result['cpu_ms_per_tx']:.2f} ms/tx on the submitting thread")
+    stages = " | ".join(f"{stage} {seconds:.3f}s" for stage, seconds in sorted(result["stage_seconds"].items()))
+    print(f"   Time split:   {stages}")
+    if previous and previous["tx_per_sec"]:
+        change = (result["tx_per_sec"] - previous["tx_per_sec"]) / previous["tx_per_sec"] * 100
+        print(f"   vs previous:  {change:+.1f}% tx/s, p95 {previous['latency_p95_ms']:.0f} → {result['latency_p95_ms']:.0f} ms")
+
+def load_previous(path, pairs, interactions, batch_size, transport):
+    """Last stored result with the same workload and block transport"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            key = (entry["pairs"], entry["interactions"], entry.get("batch_size", 0), entry.get("transport", "http"))
+            if key == (pairs, interactions, batch_size, transport):
+                previous = entry
+    return previous
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the deploy/interact hot path against a local chain")
+    parser.add_argument("--pairs", type=int, default=3, help="contract pairs to deploy per round")
+    parser.add_argument("--interactions", type=int, default=50, help="interactions per round")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=0, help="interactions per Batcher transaction (0 = one tx each)")
+    parser.add_argument("--rpc-url", help="local node to use instead of the in-process eth-tester chain")
+    parser.add_argument("--private-key", help="funded key on --rpc-url (anvil prints its dev keys)")
+    parser.add_argument("--ws", action="store_true", help="push new heads over a scripted WebSocket stand-in")
+    parser.add_argument("--ws-url", help="newHeads WebSocket endpoint of --rpc-url")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="receipt polling interval in seconds")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--verbose", action="store_true", help="show the workflow output")
+    parser.add_argument("--metrics", help="also dump the full bot.metrics JSON to this file")
+    parser.add_argument("--startup", action="store_true", help="time interpreter startup, import and the menu instead")
+    args = parser.parse_args()
+    
+    if args.rpc_url:
+        if not args.private_key:
+            parser.error("--private-key is required with --rpc-url")
+        rpc_url, private_key = args.rpc_url, args.private_key
+        ws_url = args.ws_url
+    else:
+        rpc_url, private_key, head = start_devnet()
+        ws_url = start_head_feed(head) if args.ws else None
+    transport = "ws" if ws_url else "http"
+
+    if args.startup:
+        runs = max(args.rounds, 5)
+        print(f"📊 Startup: median of {runs} cold runs against {rpc_url}")
+        for label, seconds in time_startup(runs, rpc_url, private_key).items():
+            print(f"   {label:<14} {seconds * 1000:7.0f} ms")
+        return
+
+    bot.NETWORK_CONFIG["rpcUrl"] = rpc_url
+    bot.NETWORK_CONFIG["wsUrl"] = ws_url
+    if not bot.create_web3_connection():
+        sys.exit("❌ Could not connect to the benchmark chain")
+    bot.NETWORK_CONFIG["chainId"] = bot.w3.eth.chain_id
+
+    # Keep benchmark runs out of the real journal
+    bot.journal = bot.DeploymentJournal(os.path.join(tempfile.mkdtemp(), "journal.jsonl"))
+    bot.block_watcher.poll_interval = args.poll_interval
+    account = bot.w3.eth.account.from_key(private_key)
+
+    print(f"📊 Benchmark: {args.pairs} pairs, {args.interactions} interactions, batch size {args.batch_size}, "
+          f"{args.rounds} round(s) on {rpc_url} ({transport} heads)")
+    for round_number in range(1, args.rounds + 1):
+        result = run_round(account, args.pairs, args.interactions, args.batch_size, args.verbose)
+        result["rpc_url"] = "in-process" if not args.rpc_url else args.rpc_url
+        result["transport"] = transport
+        result["ts"] = time.time()
+
+        print(f"\n🏁 Round {round_number}/{args.rounds}")
+        print_result(result, load_previous(args.output, args.pairs, args.interactions, args.batch_size, transport))
+        with open(args.output, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+    if args.metrics:
+        print(f"\n📈 Metrics written to {bot.metrics.dump(args.metrics)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,97 @@
 import os
 import json
 import random
+import hashlib
+import contextlib
 import time
-import requests
-from web3 import Web3
-from solcx import compile_source, install_solc
+from collections import deque
+from concurrent.futures import Future, wait, as_completed, FIRST_COMPLETED
+from functools import partial
 import threading
 from urllib.parse import urlparse
 
+# Imported by load_web3() on first use, together they take about a second to import
+requests = HTTPAdapter = rlp = HexBytes = None
+Web3 = AttributeDict = TransactionNotFound = Web3RPCError = ProviderConnectionError = None
+encode = function_abi_to_4byte_selector = collapse_if_tuple = None
+MeteredHTTPProvider = None
+
+def load_web3():
+    """Import web3, eth-abi, rlp and requests the first time the chain is needed"""
+    global requests, HTTPAdapter, rlp, HexBytes, Web3, AttributeDict
+    global TransactionNotFound, Web3RPCError, ProviderConnectionError
+    global encode, function_abi_to_4byte_selector, collapse_if_tuple, MeteredHTTPProvider
+    
+    if Web3 is not None:
+        return
+    import rlp
+    import requests
+    from requests.adapters import HTTPAdapter
+    from hexbytes import HexBytes
+    from web3 import Web3
+    from web3.datastructures import AttributeDict
+    from web3.exceptions import TransactionNotFound, Web3RPCError, ProviderConnectionError
+    from eth_abi import encode
+    from eth_utils import function_abi_to_4byte_selector
+    from eth_utils.abi import collapse_if_tuple
+    MeteredHTTPProvider = type("MeteredHTTPProvider", (MeteredProviderMixin, Web3.HTTPProvider), {})
+
 # ================== NETWORK CONFIG ==================
 NETWORK_CONFIG = {
     "chainId": 121214,
     "name": "Martius",
     "rpcUrl": "https://martius-i.testnet.romeprotocol.xyz",
+    "wsUrl": None,  # Optional ws(s):// endpoint, new blocks then arrive over a newHeads subscription
     "currency": "rSOL",
     "explorer": "https://romescout-martius-i.testnet.romeprotocol.xyz"
 }
 
-GAS_LIMIT = 5000000
-GAS_PRICE_GWEI = 10
+GAS_LIMIT = 5000000  # Upper bound, and fallback when estimation fails
+GAS_PRICE_GWEI = 10  # Fallback when the node reports no gas price
+GAS_MARGIN = 1.2  # Safety margin on top of eth_estimateGas
+HTTP_POOL_SIZE = 16  # Keep-alive connections per host, enough for pipelined requests
+CONNECT_TIMEOUT = 5
+RPC_TIMEOUT = 30  # Default read timeout per JSON-RPC call
+RPC_TIMEOUTS = {"eth_blockNumber": 5, "eth_chainId": 5, "eth_getBalance": 10, "eth_getTransactionReceipt": 10}
+HEALTH_CHECK_INTERVAL = 5  # Seconds a successful RPC response vouches for the connection
+BLOCK_CACHE_TTL = 5  # Seconds a per-block RPC result is served when no new head has been seen
+MAX_IN_FLIGHT = 4  # Transactions submitted ahead of their receipts
+BATCH_SIZE = 20  # Sub-calls packed into one Batcher transaction in batched mode
+RPC_BATCH_LIMIT = 100  # Calls per JSON-RPC batch for bulk reads, public nodes often cap batches here
+RECEIPT_TIMEOUT = 180
+RETRY_POLICIES = {
+    # error class: (first delay s, max delay s, attempts before giving up or None to keep retrying)
+    "connection": (1, 30, None),
+    "rate_limited": (2, 60, None),
+    "funds": (10, 60, None),  # Each attempt waits for a top-up first
+    "nonce": (0.25, 2, 10),
+    "underpriced": (1, 10, 10),
+    "server": (1, 30, 20),
+    "unknown": (2, 30, 5),
+    "fatal": (0, 0, 0),  # Invalid request or revert, retrying cannot fix it
+}
+BREAKER_THRESHOLD = 5  # Consecutive connection failures that open the circuit
+BREAKER_COOLDOWN = 30  # Seconds the circuit stays open before a trial request
+RECEIPT_POLL_INTERVAL = 1  # Seconds between new-block checks while anything waits on a block
+
+SOLC_VERSION = "0.8.20"
+ARTIFACT_CACHE_FILE = "artifacts.json"
+JOURNAL_FILE = "journal.jsonl"
+METRICS_FILE = "metrics.json"
+METRICS_PORT = None  # e.g. 9464 to serve Prometheus text on http://127.0.0.1:9464/metrics
 
 # ================== PROXY CONFIG ==================
 class ProxyManager:
     def __init__(self):
         self.online_proxies = []
-        self.local_proxies = []
+        self.local_proxies = None  # Read from proxy.txt when local proxies are first asked for
         self.current_proxy = None
         self.proxy_index = 0
         self.failed_proxies = set()
-        self.load_local_proxies()
     
     def load_local_proxies(self):
         """Load proxies from proxy.txt file"""
+        self.local_proxies = []
         if os.path.exists("proxy.txt"):
             try:
                 with open("proxy.txt", 'r') as f:
@@ -84,6 +144,8 @@ class ProxyManager:
     
     def get_working_proxy(self, proxy_type="online"):
         """Get next working proxy"""
+        if proxy_type == "local" and self.local_proxies is None:
+            self.load_local_proxies()
         proxy_list = self.online_proxies if proxy_type == "online" else self.local_proxies
         
         # If all proxies failed and we're using local, switch to online
@@ -135,6 +197,189 @@ class ProxyManager:
         except:
             return False
 
+# ================== METRICS ==================
+class Metrics:
+    """Timing histograms and counters, exported as JSON or Prometheus text"""
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 180)
+    
+    def __init__(self):
+        self.histograms = {}  # (name, labels) -> cumulative bucket counts, sum, count
+        self.counters = {}  # (name, labels) -> value
+        self.server = None
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(name, labels):
+        return name, tuple(sorted(labels.items()))
+    
+    def observe(self, name, seconds, **labels):
+        """Record one duration in a histogram"""
+        key = self.make_key(name, labels)
+        with self.lock:
+            histogram = self.histograms.setdefault(key, {"buckets": [0] * len(self.BUCKETS), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+    
+    def increment(self, name, amount=1, **labels):
+        """Add to a counter"""
+        key = self.make_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """Time a block, counting the error class if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.increment("timed_errors_total", timer=name, error=type(e).__name__)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    def total_seconds(self, name):
+        """Sum of a histogram across all label sets"""
+        with self.lock:
+            return sum(h["sum"] for (n, _), h in self.histograms.items() if n == name)
+    
+    def total_count(self, name):
+        """Sum of a counter across all label sets"""
+        with self.lock:
+            return sum(value for (n, _), value in self.counters.items() if n == name)
+    
+    def to_dict(self):
+        with self.lock:
+            histograms = [
+                {"name": name, "labels": dict(labels), "count": h["count"], "sum": round(h["sum"], 6),
+                 "avg": round(h["sum"] / h["count"], 6) if h["count"] else 0.0,
+                 "buckets": dict(zip(map(str, self.BUCKETS), h["buckets"]))}
+                for (name, labels), h in sorted(self.histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+        return {"histograms": histograms, "counters": counters}
+    
+    def dump(self, path=METRICS_FILE):
+        """Write all metrics as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+    
+    def prometheus(self):
+        """Render metrics in the Prometheus text exposition format"""
+        def render_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+        
+        lines = []
+        with self.lock:
+            typed = set()
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE bot_{name} histogram")
+                    typed.add(name)
+                for bound, count in zip(self.BUCKETS, h["buckets"]):
+                    lines.append(f"bot_{name}_bucket{render_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"bot_{name}_bucket{render_labels(labels, [('le', '+Inf')])} {h['count']}")
+                lines.append(f"bot_{name}_sum{render_labels(labels)} {h['sum']}")
+                lines.append(f"bot_{name}_count{render_labels(labels)} {h['count']}")
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE bot_{name} counter")
+                    typed.add(name)
+                lines.append(f"bot_{name}{render_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def serve(self, port):
+        """Expose /metrics on localhost from a background thread"""
+        if self.server:
+            return
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        metrics = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                body = metrics.prometheus().encode()
+                self.send_response(200 if self.path == "/metrics" else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"📈 Metrics available at http://127.0.0.1:{port}/metrics")
+
+metrics = Metrics()
+
+def create_http_session(endpoint_uri, proxy_url=None):
+    """Keep-alive session with a connection pool sized for pipelined requests"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    # Read proxy and CA settings from the environment once, not on every request
+    session.trust_env = False
+    session.proxies.update(requests.utils.get_environ_proxies(endpoint_uri))
+    session.verify = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE") or True
+    if proxy_url:
+        session.proxies.update({'http': proxy_url, 'https': proxy_url})
+    return session
+
+class MeteredProviderMixin:
+    """HTTP provider on a pooled session that times every JSON-RPC method
+    
+    load_web3() combines it with Web3.HTTPProvider into MeteredHTTPProvider.
+    """
+    def __init__(self, endpoint_uri, session=None, **kwargs):
+        super().__init__(endpoint_uri, session=session or create_http_session(endpoint_uri), **kwargs)
+        self.local = threading.local()  # Method being sent, for its timeout
+        self.last_success = 0.0
+    
+    def get_request_kwargs(self):
+        kwargs = super().get_request_kwargs()
+        method = getattr(self.local, "method", None)
+        kwargs["timeout"] = (CONNECT_TIMEOUT, RPC_TIMEOUTS.get(method, RPC_TIMEOUT))
+        return kwargs
+    
+    def is_healthy(self):
+        """True if a response arrived within HEALTH_CHECK_INTERVAL"""
+        return time.time() - self.last_success < HEALTH_CHECK_INTERVAL
+    
+    def make_request(self, method, params):
+        self.local.method = method
+        metrics.increment("rpc_requests_total", method=method)
+        metrics.increment("rpc_round_trips_total")
+        with metrics.timer("rpc_seconds", method=method):
+            response = super().make_request(method, params)
+        self.last_success = time.time()
+        if isinstance(response, dict) and response.get("error"):
+            metrics.increment("rpc_errors_total", method=method, code=response["error"].get("code"))
+        return response
+    
+    def make_batch_request(self, batch_requests):
+        self.local.method = "batch"
+        for method, _ in batch_requests:
+            metrics.increment("rpc_requests_total", method=method)
+        metrics.increment("rpc_round_trips_total")
+        with metrics.timer("rpc_seconds", method="batch"):
+            responses = super().make_batch_request(batch_requests)
+        self.last_success = time.time()
+        for (method, _), response in zip(batch_requests, responses if isinstance(responses, list) else []):
+            if response.get("error"):
+                metrics.increment("rpc_errors_total", method=method, code=response["error"].get("code"))
+        return responses
+
 # ================== CONTRACT SOURCES ==================
 STORAGE_SOURCE = '''
 pragma solidity ^0.8.0;
@@ -154,22 +399,1009 @@ contract Counter {
 }
 '''
 
+BATCHER_SOURCE = '''
+pragma solidity ^0.8.0;
+contract Batcher {
+    event CallResult(uint256 indexed index, bool success);
+    function batch(address[] calldata targets, bytes[] calldata data) external {
+        require(targets.length == data.length, "length mismatch");
+        for (uint256 i = 0; i < targets.length; i++) {
+            (bool success, ) = targets[i].call(data[i]);
+            emit CallResult(i, success);
+        }
+    }
+}
+'''
+
+CONTRACT_SOURCES = {
+    "storage": (STORAGE_SOURCE, "Storage"),
+    "counter": (COUNTER_SOURCE, "Counter"),
+    "batcher": (BATCHER_SOURCE, "Batcher")
+}
+
+CALL_RESULT_EVENT = "CallResult(uint256,bool)"
+
+# ================== ARTIFACT CACHE ==================
+class ArtifactCache:
+    """Compiled ABI/bytecode keyed by source hash, kept in memory and on disk"""
+    def __init__(self, path=ARTIFACT_CACHE_FILE):
+        self.path = path
+        self.artifacts = None  # Loaded on first lookup
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(source_code, contract_name, solc_version):
+        """Hash everything that changes the compiler output"""
+        payload = json.dumps([solc_version, contract_name, source_code])
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def load(self):
+        """Load cached artifacts from disk"""
+        self.artifacts = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.artifacts = json.load(f).get("artifacts", {})
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable artifact cache: {e}")
+    
+    def save(self):
+        """Write artifacts to disk atomically"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({"artifacts": self.artifacts}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️  Could not save artifact cache: {e}")
+    
+    def get(self, source_code, contract_name, solc_version=SOLC_VERSION):
+        """Return (abi, bytecode) or None on a cache miss"""
+        with self.lock:
+            if self.artifacts is None:
+                self.load()
+            artifact = self.artifacts.get(self.make_key(source_code, contract_name, solc_version))
+        if artifact:
+            return artifact["abi"], artifact["bin"]
+        return None
+    
+    def put(self, source_code, contract_name, abi, bytecode, solc_version=SOLC_VERSION):
+        """Store a fresh compile result and persist it"""
+        with self.lock:
+            if self.artifacts is None:
+                self.load()
+            self.artifacts[self.make_key(source_code, contract_name, solc_version)] = {
+                "contract": contract_name,
+                "solc": solc_version,
+                "abi": abi,
+                "bin": bytecode
+            }
+            self.save()
+
+# ================== NONCE MANAGER ==================
+class NonceManager:
+    """Hand out nonces locally after a single chain read per account"""
+    def __init__(self):
+        self.next_nonce = {}
+        self.lock = threading.Lock()
+    
+    def allocate(self, address):
+        """Reserve the next nonce, reading the chain only when unsynced"""
+        with self.lock:
+            if address not in self.next_nonce:
+                self.next_nonce[address] = w3.eth.get_transaction_count(address, "pending")
+            nonce = self.next_nonce[address]
+            self.next_nonce[address] += 1
+            return nonce
+    
+    def release(self, address, nonce):
+        """Return a nonce whose transaction never reached the node"""
+        with self.lock:
+            if self.next_nonce.get(address) == nonce + 1:
+                self.next_nonce[address] = nonce
+            else:
+                # Later nonces are already out, let the chain tell us where we are
+                self.next_nonce.pop(address, None)
+    
+    def invalidate(self, address):
+        """Force a chain re-read on the next allocation"""
+        with self.lock:
+            self.next_nonce.pop(address, None)
+
+# ================== RPC LAYER ==================
+class RpcError(ValueError):
+    """JSON-RPC error response, keeping the code and message for classification"""
+    def __init__(self, error):
+        error = error or {}
+        self.code = error.get("code")
+        self.message = str(error.get("message", ""))
+        self.data = error.get("data")
+        super().__init__(f"{self.message} (code {self.code})")
+
+class RpcClient:
+    """JSON-RPC layer with request batching, static and per-block caching"""
+    STATIC_METHODS = {"eth_chainId", "net_version"}
+    PER_BLOCK_METHODS = {"eth_getBalance", "eth_getTransactionCount", "eth_getCode", "eth_gasPrice", "eth_feeHistory"}
+    
+    def __init__(self):
+        self.static_cache = {}
+        self.block_cache = {}  # key -> (result, stored_at)
+        self.block = None
+        self.calls = 0
+        self.round_trips = 0
+        self.use_batch = True  # Cleared when the node refuses JSON-RPC batches
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def cache_key(method, params):
+        return method + json.dumps(params)
+    
+    def lookup(self, method, params):
+        """Return (hit, value) from the static or per-block cache"""
+        key = self.cache_key(method, params)
+        with self.lock:
+            if key in self.static_cache:
+                return True, self.static_cache[key]
+            if key in self.block_cache:
+                result, stored_at = self.block_cache[key]
+                # Nothing reports new heads while the block watcher is idle, so age entries out too
+                if time.time() - stored_at < BLOCK_CACHE_TTL:
+                    return True, result
+                del self.block_cache[key]
+        return False, None
+    
+    def store(self, method, params, result):
+        """Cache a result if it cannot change, or cannot change within a block"""
+        key = self.cache_key(method, params)
+        with self.lock:
+            if method in self.STATIC_METHODS or (method == "eth_getCode" and result not in (None, "0x")):
+                # Deployed code never disappears, so presence is static
+                self.static_cache[key] = result
+            elif method in self.PER_BLOCK_METHODS and "pending" not in params:
+                self.block_cache[key] = (result, time.time())
+    
+    def call(self, method, params):
+        """Single JSON-RPC call through the cache"""
+        return self.batch([(method, params)])[0]
+    
+    def batch(self, calls):
+        """Resolve [(method, params), ...] with at most one round-trip, one per miss if the node refuses batches"""
+        results = [None] * len(calls)
+        misses = []
+        for i, (method, params) in enumerate(calls):
+            hit, value = self.lookup(method, params)
+            if hit:
+                results[i] = value
+            else:
+                misses.append(i)
+        
+        with self.lock:
+            self.calls += len(calls)
+        
+        if not misses:
+            return results
+        
+        responses = None
+        if len(misses) > 1 and self.use_batch:
+            responses = w3.provider.make_batch_request([calls[i] for i in misses])
+            with self.lock:
+                self.round_trips += 1
+            if self.batch_refused(responses):
+                print("⚠️  Node refuses JSON-RPC batches, falling back to single requests")
+                self.use_batch = False
+                responses = None
+            elif not isinstance(responses, list):
+                raise RpcError(responses["error"])
+        if responses is None:
+            responses = [w3.provider.make_request(*calls[i]) for i in misses]
+            with self.lock:
+                self.round_trips += len(misses)
+        
+        for i, response in zip(misses, responses):
+            if response.get("error"):
+                raise RpcError(response["error"])
+            results[i] = response.get("result")
+            self.store(*calls[i], results[i])
+        return results
+    
+    @staticmethod
+    def batch_refused(responses):
+        """True if a batch reply says the node does not take batches at all"""
+        if not isinstance(responses, list):
+            return (responses.get("error") or {}).get("code", -32600) in (-32600, -32601)
+        return all((response.get("error") or {}).get("code") == -32600 for response in responses)
+    
+    def block_number(self):
+        """Fetch the head block, dropping per-block values when it moves"""
+        number = int(self.call("eth_blockNumber", []), 16)
+        self.set_block(number)
+        return number
+    
+    def set_block(self, number):
+        """Record a head learned elsewhere, e.g. from a subscription"""
+        with self.lock:
+            if number != self.block:
+                self.block = number
+                self.block_cache.clear()
+    
+    def saved(self):
+        """Round-trips avoided by batching and caching"""
+        return self.calls - self.round_trips
+
+# ================== GAS & FEES ==================
+class GasEstimator:
+    """Gas limits from eth_estimateGas, cached per contract kind and ABI function"""
+    def __init__(self, margin=GAS_MARGIN):
+        self.margin = margin
+        self.limits = {}
+        self.issued = {}  # tx hash -> (cache key, gas limit) until its receipt lands
+        self.lock = threading.Lock()
+    
+    def limit(self, contract_type, function, estimate):
+        """Return the cached limit, calling estimate() only on the first use"""
+        key = (contract_type, function)
+        with self.lock:
+            if key in self.limits:
+                return self.limits[key]
+        try:
+            gas = min(GAS_LIMIT, int(estimate() * self.margin))
+        except Exception as e:
+            print(f"⚠️  Gas estimation for {contract_type}.{function} failed, using {GAS_LIMIT:,}: {str(e)[:50]}...")
+            return GAS_LIMIT
+        with self.lock:
+            self.limits[key] = gas
+        return gas
+    
+    def sent(self, tx_hash, contract_type, function, gas):
+        """Remember which limit a submitted transaction used"""
+        with self.lock:
+            self.issued[HexBytes(tx_hash).to_0x_hex()] = ((contract_type, function), gas)
+    
+    def settle(self, tx_hash, receipt, calls_failed=False):
+        """Return True if the transaction ran out of gas, dropping the limit it used
+        
+        Estimates depend on state (a fresh storage slot costs far more than
+        an updated one), so a cached limit can be too tight for later calls.
+        calls_failed marks a mined transaction whose inner calls failed, as
+        the Batcher swallows their errors.
+        """
+        with self.lock:
+            key, gas = self.issued.pop(HexBytes(tx_hash).to_0x_hex(), (None, None))
+            if gas is None:
+                return False
+            if receipt.get("status") == 0:
+                out_of_gas = receipt.gasUsed >= gas
+            else:
+                # A call that runs out of gas burns all but 1/64 of what was left (EIP-150)
+                out_of_gas = calls_failed and receipt.gasUsed * 64 >= gas * 63
+            if not out_of_gas:
+                return False
+            self.limits.pop(key, None)
+        return True
+
+class FeeOracle:
+    """Gas price read at most once per block from eth_gasPrice and eth_feeHistory"""
+    def __init__(self):
+        self.fee_history_supported = True
+    
+    def gas_price(self):
+        """Legacy gas price covering next block's base fee plus the median tip"""
+        calls = [("eth_gasPrice", [])]
+        if self.fee_history_supported:
+            calls.append(("eth_feeHistory", [1, "latest", [50]]))
+        try:
+            results = rpc.batch(calls)
+        except RpcError as e:
+            if not self.fee_history_supported or e.code not in (-32601, -32004):
+                return Web3.to_wei(GAS_PRICE_GWEI, "gwei")
+            # Node without eth_feeHistory, stick to eth_gasPrice
+            self.fee_history_supported = False
+            return self.gas_price()
+        except Exception:
+            return Web3.to_wei(GAS_PRICE_GWEI, "gwei")
+        
+        price = int(results[0], 16) if results[0] else 0
+        history = results[1] if self.fee_history_supported else None
+        if history and history.get("baseFeePerGas"):
+            base_fee = int(history["baseFeePerGas"][-1], 16)
+            rewards = history.get("reward") or [[]]
+            tip = int(rewards[-1][0], 16) if rewards[-1] else 0
+            price = max(price, base_fee + tip)
+        return price or Web3.to_wei(GAS_PRICE_GWEI, "gwei")
+
+# ================== BLOCK WATCHER ==================
+class BlockWatcher:
+    """Follow new heads (newHeads subscription, else HTTP polling) while any subscriber needs them"""
+    def __init__(self, poll_interval=RECEIPT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.subscribers = []  # objects with wants_blocks() and on_block(number, new_block)
+        self.head = None  # Newest head seen
+        self.last_block = None  # Newest head every subscriber has handled
+        self.use_ws = True  # Cleared when the subscription fails, polling takes over
+        self.thread = None
+        self.lock = threading.Lock()
+    
+    def subscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.append(subscriber)
+    
+    def wake(self):
+        """Start following heads, call after a subscriber gains something to wait for"""
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+    
+    def running(self):
+        """True while per-block updates are flowing"""
+        return self.thread is not None
+    
+    def idle(self):
+        """Release the thread if no subscriber wants blocks, True if it should stop"""
+        with self.lock:
+            if any(subscriber.wants_blocks() for subscriber in self.subscribers):
+                return False
+            self.thread = None
+            return True
+    
+    def run(self):
+        """Stream heads if possible, poll otherwise, until nothing needs them"""
+        ws_url = NETWORK_CONFIG.get("wsUrl")
+        # A proxied session is chosen to hide the client, so don't open a direct socket next to it
+        if ws_url and self.use_ws and not proxy_manager.current_proxy:
+            try:
+                self.stream(ws_url)
+                return
+            except Exception as e:
+                print(f"⚠️  newHeads subscription failed ({str(e)[:50]}), falling back to HTTP polling")
+                metrics.increment("ws_fallback_total")
+                self.use_ws = False
+        
+        while not self.idle():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️  Block polling error: {str(e)[:60]}...")
+            time.sleep(self.poll_interval)
+    
+    def stream(self, ws_url):
+        """Follow a newHeads subscription, returns once no subscriber needs blocks"""
+        from websockets.sync.client import connect
+        
+        with connect(ws_url, open_timeout=CONNECT_TIMEOUT, max_size=None) as ws:
+            ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}))
+            reply = json.loads(ws.recv(timeout=RPC_TIMEOUT))
+            if not reply.get("result"):
+                raise RpcError(reply.get("error"))
+            metrics.increment("ws_subscriptions_total")
+            number = None  # Catch up over HTTP on anything mined before the subscription started
+            
+            while not self.idle():
+                try:
+                    if number is None:
+                        self.poll()
+                    else:
+                        self.publish(number)
+                except Exception as e:
+                    print(f"⚠️  Block handling error: {str(e)[:60]}...")
+                try:
+                    message = json.loads(ws.recv(timeout=self.poll_interval))
+                except TimeoutError:
+                    number = self.head  # No new head, still check hashes tracked since the last one
+                else:
+                    head = (message.get("params") or {}).get("result") or {}
+                    if "number" in head:
+                        number = int(head["number"], 16)
+                        metrics.increment("ws_heads_total")
+    
+    def poll(self):
+        """Read the head over HTTP and publish it"""
+        self.publish(rpc.block_number())
+    
+    def publish(self, number):
+        """Hand a head to every subscriber, dropping per-block caches when it moved"""
+        rpc.set_block(number)
+        self.head = number
+        new_block = number != self.last_block
+        errors = []
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.on_block(number, new_block)
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]  # The head stays new, so the next poll hands it out again
+        self.last_block = number
+
+# ================== RECEIPT TRACKER ==================
+def format_receipt(raw):
+    """Convert a raw JSON-RPC receipt into the shape web3 returns"""
+    def to_int(value):
+        return int(value, 16) if isinstance(value, str) else value
+    
+    receipt = dict(raw)
+    for key in ("blockNumber", "gasUsed", "cumulativeGasUsed", "effectiveGasPrice", "status", "transactionIndex", "type"):
+        if key in receipt:
+            receipt[key] = to_int(receipt[key])
+    for key in ("transactionHash", "blockHash"):
+        receipt[key] = HexBytes(receipt[key])
+    for key in ("from", "to", "contractAddress"):
+        if receipt.get(key):
+            receipt[key] = Web3.to_checksum_address(receipt[key])
+    receipt["logs"] = [
+        AttributeDict({
+            **log,
+            "address": Web3.to_checksum_address(log["address"]),
+            "topics": [HexBytes(topic) for topic in log["topics"]],
+            "data": HexBytes(log["data"]),
+            "logIndex": to_int(log.get("logIndex")),
+        })
+        for log in receipt.get("logs", [])
+    ]
+    return AttributeDict(receipt)
+
+class ReceiptTracker:
+    """Resolve all outstanding transaction hashes once per new block"""
+    def __init__(self, timeout=RECEIPT_TIMEOUT):
+        self.timeout = timeout
+        self.pending = {}  # tx hash -> (future, submitted_at)
+        self.unchecked = set()  # hashes tracked since the last receipt fetch
+        self.latencies = {}  # tx hash -> seconds from submission to inclusion
+        self.lock = threading.Lock()
+    
+    def track(self, tx_hash):
+        """Return a Future that resolves to the receipt once it is mined"""
+        future = Future()
+        with self.lock:
+            tx_hash = HexBytes(tx_hash).to_0x_hex()
+            self.pending[tx_hash] = (future, time.time())
+            self.unchecked.add(tx_hash)
+        block_watcher.wake()
+        return future
+    
+    def wants_blocks(self):
+        with self.lock:
+            return bool(self.pending)
+    
+    def fetch_receipts(self, hashes):
+        """Fetch raw receipts in one batch"""
+        return rpc.batch([("eth_getTransactionReceipt", [tx_hash]) for tx_hash in hashes])
+    
+    def on_block(self, block_number, new_block):
+        """Resolve receipts if a new block arrived or new hashes were tracked, expire stale hashes"""
+        now = time.time()
+        with self.lock:
+            if new_block:
+                hashes = list(self.pending)
+            else:
+                # Mined into the head we already checked, e.g. on a quiet chain
+                hashes = [tx_hash for tx_hash in self.unchecked if tx_hash in self.pending]
+            self.unchecked.clear()
+        if hashes:
+            try:
+                receipts = self.fetch_receipts(hashes)
+            except Exception:
+                with self.lock:
+                    self.unchecked.update(hashes)  # Look them up again on the next poll
+                raise
+            for tx_hash, raw in zip(hashes, receipts):
+                if raw:
+                    self.resolve(tx_hash, format_receipt(raw))
+        
+        with self.lock:
+            expired = [tx_hash for tx_hash, (_, submitted_at) in self.pending.items() if now - submitted_at > self.timeout]
+        for tx_hash in expired:
+            self.resolve(tx_hash, error=TimeoutError(f"Transaction {tx_hash} not mined after {self.timeout}s"))
+    
+    def resolve(self, tx_hash, receipt=None, error=None):
+        """Complete the future for a tracked hash"""
+        with self.lock:
+            entry = self.pending.pop(tx_hash, None)
+        if entry is None:
+            return
+        future, submitted_at = entry
+        if error:
+            future.set_exception(error)
+        else:
+            self.latencies[tx_hash] = time.time() - submitted_at
+            metrics.observe("receipt_wait_seconds", self.latencies[tx_hash])
+            account_state.settle(tx_hash, receipt)
+            future.set_result(receipt)
+    
+    def summary(self):
+        """Return (count, average, max) confirmation latency in seconds"""
+        values = list(self.latencies.values())
+        if not values:
+            return 0, 0.0, 0.0
+        return len(values), sum(values) / len(values), max(values)
+
+# ================== ACCOUNT STATE ==================
+class AccountState:
+    """Balance and nonces per account, refreshed once per block and kept current locally"""
+    def __init__(self):
+        self.accounts = {}  # address -> balance, confirmed and pending nonce, block they were read at
+        self.in_flight = {}  # tx hash -> (address, nonce, gas, gas price) sent but not yet mined
+        self.waiters = 0
+        self.changed = threading.Condition()
+    
+    def fetch(self, addresses, block_number=None):
+        """Read balance, confirmed and pending nonce of addresses in one round-trip
+        
+        Balance and nonce are read at an explicit block, so settle() knows
+        exactly which receipts they already include.
+        """
+        if block_number is None:
+            block_number = rpc.block_number()
+        calls = []
+        for address in addresses:
+            calls += [
+                ("eth_getBalance", [address, hex(block_number)]),
+                ("eth_getTransactionCount", [address, hex(block_number)]),
+                ("eth_getTransactionCount", [address, "pending"])
+            ]
+        results = [int(value, 16) for value in rpc.batch(calls)]
+        with self.changed:
+            for i, address in enumerate(addresses):
+                balance, nonce, pending_nonce = results[i * 3:i * 3 + 3]
+                sent = [entry[1] + 1 for entry in self.in_flight.values() if entry[0] == address]
+                self.accounts[address] = {
+                    "balance": balance,
+                    "nonce": nonce,
+                    "pending_nonce": max([pending_nonce] + sent),
+                    "block": block_number
+                }
+            self.changed.notify_all()
+    
+    def get(self, address):
+        """Current view of an account, only hits the RPC when no block updates are flowing"""
+        if address not in self.accounts or not block_watcher.running():
+            self.fetch([address])
+        with self.changed:
+            return dict(self.accounts[address])
+    
+    def spendable(self, address):
+        """Balance minus the worst-case cost of transactions still in flight"""
+        committed = sum(gas * gas_price for sender, _, gas, gas_price in self.in_flight.values() if sender == address)
+        return self.accounts[address]["balance"] - committed
+    
+    def spend(self, address, tx_hash, tx):
+        """Account for a transaction the node accepted"""
+        with self.changed:
+            self.in_flight[HexBytes(tx_hash).to_0x_hex()] = (address, tx["nonce"], tx["gas"], tx["gasPrice"])
+            if address in self.accounts:
+                state = self.accounts[address]
+                state["pending_nonce"] = max(state["pending_nonce"], tx["nonce"] + 1)
+    
+    def settle(self, tx_hash, receipt=None):
+        """Replace a transaction's worst-case cost with its receipt, or drop it if it never lands"""
+        with self.changed:
+            entry = self.in_flight.pop(HexBytes(tx_hash).to_0x_hex(), None)
+            if entry and receipt and entry[0] in self.accounts:
+                address, nonce, _, gas_price = entry
+                state = self.accounts[address]
+                if receipt["blockNumber"] > (state["block"] or 0):
+                    # Not in the balance we read yet
+                    state["balance"] -= receipt["gasUsed"] * receipt.get("effectiveGasPrice", gas_price)
+                    state["nonce"] = max(state["nonce"], nonce + 1)
+            self.changed.notify_all()
+    
+    def wait_for_balance(self, address, min_balance_wei):
+        """Block until the spendable balance covers min_balance_wei, woken by each block"""
+        self.get(address)
+        with self.changed:
+            if self.spendable(address) >= min_balance_wei:
+                return self.accounts[address]["balance"]
+            balance = self.accounts[address]["balance"]
+            self.waiters += 1
+        
+        print(f"💰 Insufficient balance: {Web3.from_wei(balance, 'ether'):.6f} {NETWORK_CONFIG['currency']}")
+        print(f"   Required: {Web3.from_wei(min_balance_wei, 'ether'):.6f} {NETWORK_CONFIG['currency']}")
+        print("   Please add funds to continue...")
+        started = time.perf_counter()
+        block_watcher.wake()
+        try:
+            with self.changed:
+                while self.spendable(address) < min_balance_wei:
+                    self.changed.wait()
+                balance = self.accounts[address]["balance"]
+        finally:
+            with self.changed:
+                self.waiters -= 1
+        metrics.observe("balance_wait_seconds", time.perf_counter() - started)
+        return balance
+    
+    def wants_blocks(self):
+        with self.changed:
+            return self.waiters > 0
+    
+    def on_block(self, block_number, new_block):
+        """Refresh every known account once per new block"""
+        if new_block and self.accounts:
+            self.fetch(list(self.accounts), block_number)
+
+# ================== DEPLOYMENT JOURNAL ==================
+class DeploymentJournal:
+    """Append-only on-disk log of runs, submitted hashes and confirmed receipts"""
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.runs = {}  # run id -> targets and confirmed progress
+        self.contracts = {}  # address -> deploy_confirmed entry
+        self.pending = {}  # tx hash -> submitted entry without a receipt yet
+        self.lock = threading.Lock()
+    
+    def load(self):
+        """Replay the journal file into the in-memory indexes"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    self.apply(json.loads(line))
+                except ValueError:
+                    continue  # Torn last line from an interrupted write
+        print(f"📒 Journal loaded: {len(self.runs)} runs, {len(self.contracts)} contracts")
+    
+    def apply(self, entry):
+        """Update the indexes for one journal entry"""
+        event = entry["event"]
+        if event == "run":
+            self.runs[entry["run"]] = {
+                "run": entry["run"],
+                "contract_count": entry["contract_count"],
+                "interaction_count": entry["interaction_count"],
+                "batch_size": entry.get("batch_size", 0),
+                "deployed": {"storage": [], "counter": [], "batcher": []},
+                "interactions": 0
+            }
+        elif event in ("deploy_submitted", "interaction_submitted"):
+            self.pending[entry["tx_hash"]] = entry
+        elif event == "deploy_confirmed":
+            self.pending.pop(entry["tx_hash"], None)
+            self.contracts[entry["address"]] = entry
+            if entry["run"] in self.runs:
+                self.runs[entry["run"]]["deployed"][entry["type"]].append(entry["address"])
+        elif event == "interaction_confirmed":
+            self.pending.pop(entry["tx_hash"], None)
+            if entry["run"] in self.runs:
+                self.runs[entry["run"]]["interactions"] += 1
+        elif event == "submission_abandoned":
+            self.pending.pop(entry["tx_hash"], None)
+        elif event == "deploy_missing":
+            confirmed = self.contracts.pop(entry["address"], None)
+            if confirmed and confirmed["run"] in self.runs:
+                self.runs[confirmed["run"]]["deployed"][confirmed["type"]].remove(entry["address"])
+    
+    def record(self, event, **fields):
+        """Append an entry to disk, then index it"""
+        entry = {"event": event, "ts": time.time(), **fields}
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.apply(entry)
+        return entry
+    
+    def start_run(self, contract_count, interaction_count, batch_size=0):
+        """Record the targets of a new workflow run and return its id"""
+        run_id = max(self.runs, default=0) + 1
+        self.record("run", run=run_id, contract_count=contract_count, interaction_count=interaction_count,
+                    batch_size=batch_size)
+        return run_id
+    
+    def last_run(self):
+        return self.runs[max(self.runs)] if self.runs else None
+    
+    def is_complete(self, run_id):
+        run = self.runs[run_id]
+        return (len(run["deployed"]["storage"]) >= run["contract_count"]
+                and len(run["deployed"]["counter"]) >= run["contract_count"]
+                and run["interactions"] >= run["interaction_count"])
+    
+    def run_contracts(self, run_id):
+        """Confirmed contracts of a run as deployed_contracts entries, in pair order"""
+        if run_id not in self.runs:
+            return []
+        deployed = self.runs[run_id]["deployed"]
+        contracts = []
+        for i in range(max(len(deployed["storage"]), len(deployed["counter"]))):
+            for contract_type in ("storage", "counter"):
+                if i < len(deployed[contract_type]):
+                    contracts.append({"name": contract_type, "address": deployed[contract_type][i]})
+        return contracts
+    
+    def verify(self):
+        """Settle hashes the last session left pending and check contract code
+        
+        A hash the node still knows without a receipt is waited for before
+        anything is resubmitted, only hashes it has forgotten are abandoned.
+        A failed check is reported and skipped rather than ending the workflow.
+        """
+        try:
+            self.settle_pending()
+        except Exception as e:
+            print(f"⚠️  Could not settle pending journal entries: {str(e)[:60]}...")
+        try:
+            self.check_contracts()
+        except Exception as e:
+            print(f"⚠️  Could not verify contract code: {str(e)[:60]}...")
+    
+    def settle_pending(self):
+        """Look up receipt and transaction of every pending hash, waiting on unmined ones"""
+        pending = list(self.pending.values())
+        waiting = {}  # receipt future -> pending entry
+        for start in range(0, len(pending), RPC_BATCH_LIMIT // 2):
+            chunk = pending[start:start + RPC_BATCH_LIMIT // 2]
+            calls = []
+            for entry in chunk:
+                calls.append(("eth_getTransactionReceipt", [entry["tx_hash"]]))
+                calls.append(("eth_getTransactionByHash", [entry["tx_hash"]]))
+            results = rpc.batch(calls)
+            for entry, raw, transaction in zip(chunk, results[::2], results[1::2]):
+                if raw:
+                    self.confirm(entry, format_receipt(raw))
+                elif transaction:
+                    waiting[receipt_tracker.track(entry["tx_hash"])] = entry
+                else:
+                    self.record("submission_abandoned", tx_hash=entry["tx_hash"])
+        
+        if waiting:
+            print(f"⏳ Waiting for {len(waiting)} transactions from the last session that are still unmined...")
+            for future in as_completed(waiting):
+                try:
+                    self.confirm(waiting[future], future.result())
+                except Exception as e:
+                    print(f"⚠️  {waiting[future]['tx_hash']} left pending: {str(e)[:60]}...")
+    
+    def confirm(self, entry, receipt):
+        """Record the outcome of a pending entry from its receipt"""
+        if receipt.get("status") == 0:
+            self.record("submission_abandoned", tx_hash=entry["tx_hash"])
+        elif entry["event"] == "deploy_submitted" and receipt.contractAddress:
+            self.record("deploy_confirmed", run=entry["run"], type=entry["type"], address=receipt.contractAddress,
+                        tx_hash=entry["tx_hash"], block=receipt.blockNumber)
+        elif entry["event"] == "interaction_submitted" and "calls" in entry:
+            succeeded = batch_call_results(receipt)
+            for index, address in enumerate(entry["calls"]):
+                if succeeded.get(index):
+                    self.record("interaction_confirmed", run=entry["run"], address=address,
+                                tx_hash=entry["tx_hash"], block=receipt.blockNumber, index=index)
+            if not any(succeeded.values()):
+                self.record("submission_abandoned", tx_hash=entry["tx_hash"])
+        elif entry["event"] == "interaction_submitted":
+            self.record("interaction_confirmed", run=entry["run"], address=entry["address"],
+                        tx_hash=entry["tx_hash"], block=receipt.blockNumber)
+    
+    def check_contracts(self):
+        """Mark journaled contracts whose code is gone, a batch of RPC_BATCH_LIMIT at a time"""
+        addresses = list(self.contracts)
+        missing = []
+        for start in range(0, len(addresses), RPC_BATCH_LIMIT):
+            chunk = addresses[start:start + RPC_BATCH_LIMIT]
+            codes = rpc.batch([("eth_getCode", [address, "latest"]) for address in chunk])
+            missing.extend(address for address, code in zip(chunk, codes) if code in (None, "0x"))
+        for address in missing:
+            self.record("deploy_missing", address=address)
+        if addresses:
+            print(f"🔍 Journal verified: {len(addresses) - len(missing)} contracts on-chain, {len(missing)} missing")
+
+# ================== RETRY POLICY ==================
+class RetryError(Exception):
+    """Raised once the retry policy gives up on a submission"""
+    def __init__(self, stage, error_class, error):
+        super().__init__(f"{stage} gave up after a {error_class} error: {str(error)[:100]}")
+        self.stage = stage
+        self.error_class = error_class
+        self.error = error
+
+class RetryPolicy:
+    """Error classes, per-class backoff with jitter and budgets, and a circuit breaker"""
+    RPC_CODES = {
+        -32700: "fatal",  # Parse error
+        -32600: "fatal",  # Invalid request
+        -32601: "fatal",  # Method not found
+        -32602: "fatal",  # Invalid params
+        -32603: "server",  # Internal error
+        -32002: "server",  # Resource unavailable
+        -32004: "fatal",  # Method not supported
+        -32005: "rate_limited",  # Limit exceeded
+        3: "fatal",  # Execution reverted
+    }
+    # Nodes report most transaction rejections as a generic -32000/-32003/-32010,
+    # only those are told apart by their message
+    REJECTIONS = (
+        ("replacement transaction underpriced", "nonce"),
+        ("nonce too low", "nonce"),
+        ("nonce too high", "nonce"),
+        ("invalid nonce", "nonce"),
+        ("insufficient funds", "funds"),
+        ("underpriced", "underpriced"),
+        ("less than block base fee", "underpriced"),
+        ("execution reverted", "fatal"),
+        ("intrinsic gas too low", "fatal"),
+        ("rate limit", "rate_limited"),
+    )
+    
+    def __init__(self, policies=RETRY_POLICIES, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.policies = policies
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0  # Consecutive connection failures
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+    
+    def classify(self, error):
+        """Map an exception to one of the RETRY_POLICIES classes"""
+        if isinstance(error, Web3RPCError) and isinstance(error.rpc_response, dict):
+            error = RpcError(error.rpc_response.get("error"))
+        if isinstance(error, RpcError):
+            if error.code in self.RPC_CODES:
+                return self.RPC_CODES[error.code]
+            message = error.message.lower()
+            for text, error_class in self.REJECTIONS:
+                if text in message:
+                    return error_class
+            return "unknown"
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            if status == 429:
+                return "rate_limited"
+            return "server" if status >= 500 else "fatal"
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                              ConnectionError, TimeoutError, ProviderConnectionError)):
+            return "connection"
+        if isinstance(error, (ValueError, TypeError, KeyError)):
+            return "fatal"  # Encoding or signing bug, the same input fails again
+        return "unknown"
+    
+    def should_retry(self, error_class, attempts):
+        """True while the class has budget left for another attempt"""
+        budget = self.policies[error_class][2]
+        return budget is None or attempts < budget
+    
+    def delay(self, error_class, attempts):
+        """Exponential backoff for the nth attempt of a class, with jitter"""
+        first, cap, _ = self.policies[error_class]
+        return random.uniform(0.5, 1.0) * min(cap, first * 2 ** (attempts - 1))
+    
+    def backoff(self, stage, error_class, attempts):
+        """Sleep before the next attempt, recording the time spent"""
+        seconds = self.delay(error_class, attempts)
+        metrics.observe("backoff_seconds", seconds, stage=stage, error_class=error_class)
+        time.sleep(seconds)
+    
+    def record(self, error_class=None):
+        """Count a connection failure towards the breaker, any other outcome resets it"""
+        with self.lock:
+            if error_class != "connection":
+                self.failures = 0
+                self.open_until = 0.0
+                return
+            self.failures += 1
+            # A failed trial attempt after the cooldown reopens the circuit straight away
+            if self.failures >= self.threshold or self.open_until:
+                self.open_until = time.time() + self.cooldown
+                self.failures = 0
+                metrics.increment("circuit_open_total")
+                print(f"🔌 RPC endpoint looks down, pausing submissions for {self.cooldown}s")
+    
+    def wait_for_circuit(self, stage):
+        """Block while the breaker is open, then let a trial attempt through"""
+        with self.lock:
+            seconds = self.open_until - time.time()
+        if seconds > 0:
+            metrics.observe("backoff_seconds", seconds, stage=stage, error_class="circuit_open")
+            time.sleep(seconds)
+
+# ================== TRANSACTION TEMPLATES ==================
+class TransactionTemplates:
+    """Deploy payloads and function selectors, prepared once per contract type"""
+    def __init__(self):
+        self.deploys = {}  # contract type -> creation bytecode
+        self.functions = {}  # (contract type, function) -> (selector, argument types)
+        self.lock = threading.Lock()
+    
+    def prepare(self, contract_type):
+        """Compile a contract type and fill its templates, so retried attempts never compile"""
+        with self.lock:
+            if contract_type in self.deploys:
+                return
+        abi, _ = compile_contract(*CONTRACT_SOURCES[contract_type])
+        for entry in abi:
+            if entry.get("type") == "function":
+                self.function(contract_type, entry["name"])
+        self.deploy_data(contract_type)
+    
+    def deploy_data(self, contract_type):
+        """Creation payload, none of the contracts take constructor arguments"""
+        with self.lock:
+            data = self.deploys.get(contract_type)
+        if data is None:
+            _, bytecode = compile_contract(*CONTRACT_SOURCES[contract_type])
+            data = bytes(HexBytes(bytecode))
+            with self.lock:
+                self.deploys[contract_type] = data
+        return data
+    
+    def function(self, contract_type, fn_name):
+        """Selector and ABI argument types of one contract function"""
+        key = (contract_type, fn_name)
+        with self.lock:
+            template = self.functions.get(key)
+        if template is None:
+            abi, _ = compile_contract(*CONTRACT_SOURCES[contract_type])
+            entry = next(item for item in abi if item.get("type") == "function" and item["name"] == fn_name)
+            template = (function_abi_to_4byte_selector(entry), [collapse_if_tuple(arg) for arg in entry["inputs"]])
+            with self.lock:
+                self.functions[key] = template
+        return template
+    
+    def calldata(self, contract_type, fn_name, args):
+        """Encode a call from the cached selector, no contract object needed"""
+        selector, types = self.function(contract_type, fn_name)
+        return selector + encode(types, args)
+    
+    @staticmethod
+    def transaction(data, gas, gas_price, nonce, to=None):
+        """Legacy transaction with the per-call fields filled in, ready to sign"""
+        tx = {
+            "data": data,
+            "value": 0,
+            "gas": gas,
+            "gasPrice": gas_price,
+            "nonce": nonce,
+            "chainId": NETWORK_CONFIG["chainId"]
+        }
+        if to:
+            tx["to"] = to
+        return tx
+
+def estimate_gas(sender, data, to=None):
+    """eth_estimateGas for a raw payload"""
+    tx = {"from": sender, "data": HexBytes(data).to_0x_hex()}
+    if to:
+        tx["to"] = to
+    return int(rpc.call("eth_estimateGas", [tx]), 16)
+
 # ================== GLOBAL VARIABLES ==================
 proxy_manager = ProxyManager()
 w3 = None
+direct_provider = None  # Long-lived provider reused across reconnects
 deployed_contracts = []
+artifact_cache = ArtifactCache()
+nonce_manager = NonceManager()
+rpc = RpcClient()
+block_watcher = BlockWatcher()
+receipt_tracker = ReceiptTracker()
+account_state = AccountState()
+block_watcher.subscribe(receipt_tracker)  # Receipts first, so account state settles them before refreshing
+block_watcher.subscribe(account_state)
+gas_estimator = GasEstimator()
+fee_oracle = FeeOracle()
+journal = DeploymentJournal()
+retry_policy = RetryPolicy()
+templates = TransactionTemplates()
+solc_ready = False
 
 # ================== WEB3 CONNECTION ==================
 def create_web3_connection(use_proxy=False, proxy_type="online", max_retries=10):
     """Create Web3 connection with enhanced retry logic"""
-    global w3
+    global w3, direct_provider
     
+    load_web3()
     if not use_proxy:
         try:
-            w3 = Web3(Web3.HTTPProvider(NETWORK_CONFIG["rpcUrl"]))
-            if w3.is_connected():
-                print("✅ Direct connection established")
-                return True
+            # Reuse the pooled provider so warm connections survive a reconnect
+            if direct_provider is None or direct_provider.endpoint_uri != NETWORK_CONFIG["rpcUrl"]:
+                direct_provider = MeteredHTTPProvider(NETWORK_CONFIG["rpcUrl"])
+            if w3 is None or w3.provider is not direct_provider:
+                w3 = Web3(direct_provider)
+            rpc.block_number()
+            proxy_manager.current_proxy = None
+            print("✅ Direct connection established")
+            check_chain_id()
+            return True
         except:
             pass
         print("❌ Direct connection failed")
@@ -192,22 +1424,15 @@ def create_web3_connection(use_proxy=False, proxy_type="online", max_retries=10)
             
             print(f"🔄 Attempt {attempt + 1}: Testing proxy {proxy_url[:50]}...")
             
-            # Create Web3 with proxy
-            session = requests.Session()
-            session.proxies.update({'http': proxy_url, 'https': proxy_url})
-            session.timeout = 15
-            
-            w3 = Web3(Web3.HTTPProvider(
-                NETWORK_CONFIG["rpcUrl"],
-                request_kwargs={'proxies': {'http': proxy_url, 'https': proxy_url}, 'timeout': 30}
-            ))
+            # Create Web3 with a pooled session routed through the proxy
+            w3 = Web3(MeteredHTTPProvider(NETWORK_CONFIG["rpcUrl"], session=create_http_session(NETWORK_CONFIG["rpcUrl"], proxy_url)))
             
             # Test connection
-            if w3.is_connected():
-                balance_test = w3.eth.get_block('latest')  # More thorough test
-                proxy_manager.current_proxy = proxy_url
-                print(f"✅ Connected via proxy: {proxy_url[:50]}...")
-                return True
+            rpc.block_number()
+            proxy_manager.current_proxy = proxy_url
+            print(f"✅ Connected via proxy: {proxy_url[:50]}...")
+            check_chain_id()
+            return True
                 
         except Exception as e:
             print(f"⚠️  Proxy {proxy_url[:30] if 'proxy_url' in locals() else 'unknown'} failed: {str(e)[:50]}...")
@@ -219,18 +1444,30 @@ def create_web3_connection(use_proxy=False, proxy_type="online", max_retries=10)
     print(f"❌ Failed to connect after {max_retries} attempts")
     return False
 
+def check_chain_id():
+    """Warn when the RPC serves a different chain than configured"""
+    try:
+        chain_id = int(rpc.call("eth_chainId", []), 16)
+        if chain_id != NETWORK_CONFIG["chainId"]:
+            print(f"⚠️  RPC reports chain ID {chain_id}, expected {NETWORK_CONFIG['chainId']}")
+    except Exception as e:
+        print(f"⚠️  Could not verify chain ID: {str(e)[:50]}...")
+
 def ensure_connection(use_proxy=False, proxy_type="online"):
-    """Ensure Web3 connection with intelligent retry"""
+    """Ensure Web3 connection, trusting any response seen in the last few seconds"""
     global w3
     
-    # Test current connection
-    try:
-        if w3 and w3.is_connected():
-            # Quick test
-            w3.eth.get_block('latest')
-            return True
-    except:
-        pass
+    if w3 and w3.provider.is_healthy():
+        return True
+    
+    # Test current connection, retrying a transient error on the same warm provider
+    for attempt in range(2):
+        try:
+            if w3:
+                rpc.block_number()
+                return True
+        except:
+            time.sleep(1)
     
     print("🔄 Connection lost, reconnecting...")
     return create_web3_connection(use_proxy, proxy_type, max_retries=20)
@@ -259,52 +1496,14 @@ def load_accounts():
 def clear():
     os.system("cls" if os.name == "nt" else "clear")
 
-def get_balance(address):
-    """Get balance with retry logic"""
-    for attempt in range(3):
-        try:
-            return w3.eth.get_balance(address)
-        except Exception as e:
-            if attempt < 2:
-                print(f"⚠️  Error getting balance, retrying... ({attempt + 1}/3)")
-                time.sleep(1)
-            else:
-                print(f"❌ Failed to get balance: {e}")
-                return 0
-
-def get_nonce(address):
-    """Get nonce with retry logic"""
-    for attempt in range(3):
-        try:
-            return w3.eth.get_transaction_count(address, "pending")
-        except Exception as e:
-            if attempt < 2:
-                print(f"⚠️  Error getting nonce, retrying... ({attempt + 1}/3)")
-                time.sleep(1)
-            else:
-                print(f"❌ Failed to get nonce: {e}")
-                return 0
+def create_address(sender, nonce):
+    """Address of the contract that sender deploys with this nonce (CREATE)"""
+    encoded = rlp.encode([bytes(HexBytes(sender)), nonce])
+    return Web3.to_checksum_address(Web3.keccak(encoded)[12:])
 
-def wait_for_balance(address, min_balance_wei=1000000000000000):  # 0.001 ETH
-    """Wait for sufficient balance"""
-    while True:
-        try:
-            current_balance = get_balance(address)
-            if current_balance >= min_balance_wei:
-                return current_balance
-            
-            balance_eth = w3.from_wei(current_balance, 'ether')
-            min_balance_eth = w3.from_wei(min_balance_wei, 'ether')
-            
-            print(f"💰 Insufficient balance: {balance_eth:.6f} {NETWORK_CONFIG['currency']}")
-            print(f"   Required: {min_balance_eth:.6f} {NETWORK_CONFIG['currency']}")
-            print("   Please add funds to continue...")
-            
-            time.sleep(10)  # Wait 10 seconds before checking again
-            
-        except Exception as e:
-            print(f"⚠️  Error checking balance: {e}")
-            time.sleep(5)
+def wait_for_balance(address, min_balance_wei):
+    """Wait until the balance covers min_balance_wei (expected gas cost)"""
+    return account_state.wait_for_balance(address, min_balance_wei)
 
 def report_tx(receipt, operation="Transaction", show_balance=True):
     """Report transaction details"""
@@ -312,14 +1511,16 @@ def report_tx(receipt, operation="Transaction", show_balance=True):
     print(f"📝 TxHash: {receipt.transactionHash.hex()}")
     print(f"⛽ Gas Used: {receipt.gasUsed:,}")
     
+    latency = receipt_tracker.latencies.get(receipt.transactionHash.to_0x_hex())
+    if latency is not None:
+        print(f"⏱️  Included after {latency:.1f}s")
+    
     if operation.startswith("Deploy") and hasattr(receipt, 'contractAddress'):
         print(f"📍 Contract: {receipt.contractAddress}")
     
     if show_balance:
         try:
-            private_keys = load_accounts()
-            account = w3.eth.account.from_key(private_keys[0])
-            balance = get_balance(account.address)
+            balance = account_state.get(receipt["from"])["balance"]
             print(f"💰 Balance: {w3.from_wei(balance, 'ether'):.6f} {NETWORK_CONFIG['currency']}")
         except:
             pass
@@ -327,167 +1528,457 @@ def report_tx(receipt, operation="Transaction", show_balance=True):
     print("─" * 60)
 
 # ================== COMPILE CONTRACT ==================
+def ensure_solc():
+    """Install the compiler once per process, only if it is missing"""
+    global solc_ready
+    
+    if solc_ready:
+        return
+    from solcx import get_installed_solc_versions, install_solc
+    if SOLC_VERSION not in {str(v) for v in get_installed_solc_versions()}:
+        install_solc(SOLC_VERSION)
+    solc_ready = True
+
 def compile_contract(source_code, contract_name):
-    """Compile Solidity contract"""
+    """Compile Solidity contract, served from the artifact cache when possible"""
+    cached = artifact_cache.get(source_code, contract_name)
+    if cached:
+        metrics.increment("artifact_cache_total", result="hit")
+        return cached
+    metrics.increment("artifact_cache_total", result="miss")
+    
     try:
-        install_solc("0.8.20")
-        compiled = compile_source(source_code, output_values=["abi", "bin"], solc_version="0.8.20")
+        ensure_solc()
+        from solcx import compile_source
+        with metrics.timer("compile_seconds", contract=contract_name):
+            compiled = compile_source(source_code, output_values=["abi", "bin"], solc_version=SOLC_VERSION)
         contract_interface = compiled[f"<stdin>:{contract_name}"]
+        artifact_cache.put(source_code, contract_name, contract_interface["abi"], contract_interface["bin"])
         return contract_interface["abi"], contract_interface["bin"]
     except Exception as e:
         print(f"❌ Compilation error: {e}")
         raise
 
 # ================== DEPLOY WITH PERSISTENCE ==================
-def deploy_contract_persistent(abi, bytecode, account, contract_name, use_proxy=False, proxy_type="online"):
-    """Deploy contract with infinite retry until success"""
-    attempt = 0
+def send_transaction(tx, account):
+    """Sign and broadcast, treating an already known transaction as sent"""
+    with metrics.timer("sign_seconds"):
+        signed = account.sign_transaction(tx)
+    try:
+        with metrics.timer("send_seconds"):
+            tx_hash = HexBytes(rpc.call("eth_sendRawTransaction", [signed.raw_transaction.to_0x_hex()]))
+    except Exception as e:
+        if "already known" not in str(e).lower():
+            raise
+        tx_hash = signed.hash
+    account_state.spend(account.address, tx_hash, tx)
+    return tx_hash
+
+def submit_with_retry(stage, account, attempt, use_proxy=False, proxy_type="online"):
+    """Call attempt() until it returns, backing off per error class
+    
+    attempt() builds, signs and sends one transaction and releases its
+    nonce if that fails. Raises RetryError for errors that retrying
+    cannot fix, or once their class has used up its retry budget.
+    """
+    attempts = {}  # error class -> failed attempts
     
     while True:
-        attempt += 1
+        retry_policy.wait_for_circuit(stage)
         try:
-            # Ensure connection
             if not ensure_connection(use_proxy, proxy_type):
-                print(f"⚠️  Connection failed on attempt {attempt}, retrying in 5 seconds...")
-                time.sleep(5)
-                continue
-            
-            # Wait for sufficient balance
-            wait_for_balance(account.address)
-            
-            contract = w3.eth.contract(abi=abi, bytecode=bytecode)
-            nonce = get_nonce(account.address)
-            
-            if nonce == 0:  # Nonce error
-                print("⚠️  Invalid nonce, reconnecting...")
-                if use_proxy:
-                    create_web3_connection(use_proxy, proxy_type)
-                time.sleep(2)
-                continue
-            
-            tx = contract.constructor().build_transaction({
-                "from": account.address,
-                "gas": GAS_LIMIT,
-                "gasPrice": w3.to_wei(GAS_PRICE_GWEI, "gwei"),
-                "nonce": nonce,
-                "chainId": NETWORK_CONFIG["chainId"]
-            })
-            
-            signed = w3.eth.account.sign_transaction(tx, account.key)
-            tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-            
-            print(f"🔄 Waiting for {contract_name} deployment confirmation...")
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180)
-            
-            return receipt
-            
+                raise ConnectionError("RPC endpoint unreachable")
+            result = attempt()
+            retry_policy.record()
+            return result
         except Exception as e:
-            error_msg = str(e)
-            print(f"⚠️  Deploy attempt {attempt} failed: {error_msg[:100]}...")
-            
-            # Handle specific errors
-            if "insufficient funds" in error_msg.lower():
-                print("💰 Insufficient funds detected, waiting for balance...")
-                wait_for_balance(account.address)
-                continue
+            error_class = retry_policy.classify(e)
+            attempts[error_class] = attempts.get(error_class, 0) + 1
+            retry_policy.record(error_class)
+            metrics.increment("submit_errors_total", stage=stage, error=type(e).__name__, error_class=error_class)
+            print(f"⚠️  {stage.title()} attempt failed ({error_class}): {str(e)[:100]}...")
             
-            if "nonce" in error_msg.lower() or "already known" in error_msg.lower():
-                print("🔄 Nonce issue, waiting and retrying...")
-                time.sleep(5)
-                continue
+            if not retry_policy.should_retry(error_class, attempts[error_class]):
+                raise RetryError(stage, error_class, e) from e
             
-            if "connection" in error_msg.lower() or "timeout" in error_msg.lower():
+            if error_class == "nonce":
+                print("🔄 Nonce issue, resyncing from chain...")
+                nonce_manager.invalidate(account.address)
+            elif error_class == "connection" and use_proxy:
                 print("🔄 Connection issue, switching proxy...")
-                if use_proxy:
-                    create_web3_connection(use_proxy, proxy_type)
-                time.sleep(3)
-                continue
-            
-            # Generic retry with delay
-            wait_time = min(30, attempt * 2)  # Exponential backoff, max 30s
-            print(f"🔄 Retrying in {wait_time} seconds...")
-            time.sleep(wait_time)
+                create_web3_connection(use_proxy, proxy_type)
+            retry_policy.backoff(stage, error_class, attempts[error_class])
+
+def send_with_nonce(account, build, kind):
+    """Allocate a nonce, build and send the transaction, returns (tx_hash, nonce)"""
+    nonce = nonce_manager.allocate(account.address)
+    try:
+        with metrics.timer("build_seconds", kind=kind, part="transaction"):
+            tx = build(nonce)
+        return send_transaction(tx, account), nonce
+    except Exception:
+        nonce_manager.release(account.address, nonce)
+        raise
+
+def deploy_contract_persistent(contract_type, account, use_proxy=False, proxy_type="online"):
+    """Submit contract deployment under the retry policy, returns (tx_hash, precomputed address)"""
+    _, contract_name = CONTRACT_SOURCES[contract_type]
+    templates.prepare(contract_type)  # A failed compile or solc download is not an RPC error to retry
+    data = templates.deploy_data(contract_type)
+    
+    def attempt():
+        gas = gas_estimator.limit(contract_type, "constructor", lambda: estimate_gas(account.address, data))
+        gas_price = fee_oracle.gas_price()
+        
+        # Wait for sufficient balance
+        wait_for_balance(account.address, gas * gas_price)
+        
+        tx_hash, nonce = send_with_nonce(account, lambda nonce: templates.transaction(data, gas, gas_price, nonce), "deploy")
+        gas_estimator.sent(tx_hash, contract_type, "constructor", gas)
+        address = create_address(account.address, nonce)
+        print(f"🔄 {contract_name} deployment submitted (nonce {nonce}) → {address}")
+        return tx_hash, address
+    
+    return submit_with_retry("deploy", account, attempt, use_proxy, proxy_type)
+
+def prepare_interaction(contract_type):
+    """Pick random arguments, returns (function name, calldata, description)"""
+    if contract_type == "storage":
+        value = random.randint(1, 1000)
+        fn_name, args, description = "set", [value], f"Storage.set({value})"
+    elif contract_type == "counter":
+        increment = random.randint(1, 50)
+        fn_name, args, description = "increment", [increment], f"Counter.increment({increment})"
+    else:
+        raise ValueError(f"Unknown contract type: {contract_type}")
+    
+    return fn_name, templates.calldata(contract_type, fn_name, args), description
 
 def interact_contract_persistent(contract_address, contract_type, account, use_proxy=False, proxy_type="online"):
-    """Interact with contract with infinite retry until success"""
-    attempt = 0
+    """Submit contract interaction under the retry policy, returns (tx_hash, description)"""
+    templates.prepare(contract_type)
     
-    while True:
-        attempt += 1
-        try:
-            # Ensure connection
-            if not ensure_connection(use_proxy, proxy_type):
-                print(f"⚠️  Connection failed on attempt {attempt}, retrying in 5 seconds...")
-                time.sleep(5)
+    def attempt():
+        with metrics.timer("build_seconds", kind="interact", part="calldata"):
+            fn_name, data, operation_desc = prepare_interaction(contract_type)
+        gas = gas_estimator.limit(contract_type, fn_name, lambda: estimate_gas(account.address, data, contract_address))
+        gas_price = fee_oracle.gas_price()
+        
+        # Wait for sufficient balance
+        wait_for_balance(account.address, gas * gas_price)
+        
+        tx_hash, _ = send_with_nonce(account, lambda nonce: templates.transaction(data, gas, gas_price, nonce, contract_address), "interact")
+        gas_estimator.sent(tx_hash, contract_type, fn_name, gas)
+        return tx_hash, operation_desc
+    
+    return submit_with_retry("interact", account, attempt, use_proxy, proxy_type)
+
+def interact_batch_persistent(batcher_address, targets, account, use_proxy=False, proxy_type="online"):
+    """Submit one Batcher transaction for many interactions under the retry policy
+    
+    targets is a list of deployed_contracts entries. Returns (tx_hash,
+    descriptions) with one description per sub-call, in order.
+    """
+    for contract_type in {"batcher"} | {contract_info['name'] for contract_info in targets}:
+        templates.prepare(contract_type)
+    
+    def attempt():
+        addresses, payloads, descriptions = [], [], []
+        with metrics.timer("build_seconds", kind="batch", part="calldata"):
+            for contract_info in targets:
+                _, payload, description = prepare_interaction(contract_info['name'])
+                addresses.append(contract_info['address'])
+                payloads.append(payload)
+                descriptions.append(description)
+            data = templates.calldata("batcher", "batch", [addresses, payloads])
+        
+        function = f"batch[{len(targets)}]"
+        gas = gas_estimator.limit("batcher", function, lambda: estimate_gas(account.address, data, batcher_address))
+        gas_price = fee_oracle.gas_price()
+        
+        # Wait for sufficient balance
+        wait_for_balance(account.address, gas * gas_price)
+        
+        tx_hash, _ = send_with_nonce(account, lambda nonce: templates.transaction(data, gas, gas_price, nonce, batcher_address), "batch")
+        gas_estimator.sent(tx_hash, "batcher", function, gas)
+        return tx_hash, descriptions
+    
+    return submit_with_retry("batch", account, attempt, use_proxy, proxy_type)
+
+def batch_call_results(receipt):
+    """Success flag per sub-call index from the Batcher CallResult events"""
+    topic = Web3.keccak(text=CALL_RESULT_EVENT)
+    results = {}
+    for log in receipt.logs:
+        if log.topics and log.topics[0] == topic:
+            results[int.from_bytes(log.topics[1], "big")] = int.from_bytes(log.data[-32:], "big") != 0
+    return results
+
+# ================== PIPELINED SUBMISSION ==================
+def is_transaction_dropped(tx_hash):
+    """Check whether the node has forgotten a submitted transaction"""
+    try:
+        w3.eth.get_transaction(tx_hash)
+        return False
+    except TransactionNotFound:
+        return True
+    except Exception:
+        return False
+
+def pipeline_transactions(jobs, account, on_receipt, max_in_flight=MAX_IN_FLIGHT, depends=None):
+    """Run jobs with up to max_in_flight transactions awaiting receipts
+    
+    Each job is a callable that submits one transaction and returns
+    (tx_hash, description). on_receipt(index, receipt, description) is
+    called as soon as each successful receipt lands, and returns True if
+    calls inside the transaction failed; the job then counts as failed,
+    or is resubmitted once if they ran out of gas. depends maps a job index to the
+    job indexes whose receipts must land before it is submitted, e.g. an
+    interaction waiting for its contract's deploy. Dropped transactions
+    are resubmitted with a fresh nonce, and one that ran out of gas once
+    more with a fresh estimate. A job the retry policy gives up on or whose
+    transaction reverted is skipped along with the jobs that depend on it,
+    returns the indexes of all skipped jobs.
+    """
+    queue = deque(enumerate(jobs))
+    in_flight = {}  # future -> (index, job, tx_hash, description)
+    depends = depends or {}
+    landed = set()
+    failed = set()
+    regassed = set()  # jobs already resubmitted after running out of gas
+    
+    while queue or in_flight:
+        while queue and len(in_flight) < max_in_flight:
+            blocked = [item for item in queue if failed.intersection(depends.get(item[0], ()))]
+            if blocked:
+                print(f"⏭️  Skipping {len(blocked)} jobs that depend on a failed submission")
+                for item in blocked:
+                    queue.remove(item)
+                    failed.add(item[0])
                 continue
-            
-            # Wait for sufficient balance
-            wait_for_balance(account.address)
-            
-            if contract_type == "storage":
-                abi, _ = compile_contract(STORAGE_SOURCE, "Storage")
-                contract = w3.eth.contract(address=contract_address, abi=abi)
-                value = random.randint(1, 1000)
-                
-                tx = contract.functions.set(value).build_transaction({
-                    "from": account.address,
-                    "gas": GAS_LIMIT,
-                    "gasPrice": w3.to_wei(GAS_PRICE_GWEI, 'gwei'),
-                    "nonce": get_nonce(account.address),
-                    "chainId": NETWORK_CONFIG["chainId"]
-                })
-                
-                operation_desc = f"Storage.set({value})"
-                
-            elif contract_type == "counter":
-                abi, _ = compile_contract(COUNTER_SOURCE, "Counter")
-                contract = w3.eth.contract(address=contract_address, abi=abi)
-                increment = random.randint(1, 50)
-                
-                tx = contract.functions.increment(increment).build_transaction({
-                    "from": account.address,
-                    "gas": GAS_LIMIT,
-                    "gasPrice": w3.to_wei(GAS_PRICE_GWEI, 'gwei'),
-                    "nonce": get_nonce(account.address),
-                    "chainId": NETWORK_CONFIG["chainId"]
-                })
-                
-                operation_desc = f"Counter.increment({increment})"
-            
-            signed = w3.eth.account.sign_transaction(tx, account.key)
-            tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180)
-            
-            print(f"📝 {operation_desc}")
-            return receipt
-            
-        except Exception as e:
-            error_msg = str(e)
-            print(f"⚠️  Interaction attempt {attempt} failed: {error_msg[:100]}...")
-            
-            # Handle specific errors (same logic as deploy)
-            if "insufficient funds" in error_msg.lower():
-                print("💰 Insufficient funds detected, waiting for balance...")
-                wait_for_balance(account.address)
+            ready = next((item for item in queue if landed.issuperset(depends.get(item[0], ()))), None)
+            if ready is None:
+                break
+            queue.remove(ready)
+            index, job = ready
+            try:
+                tx_hash, description = job()
+            except RetryError as e:
+                print(f"❌ {e}")
+                failed.add(index)
                 continue
-            
-            if "nonce" in error_msg.lower():
-                print("🔄 Nonce issue, waiting and retrying...")
-                time.sleep(5)
+            in_flight[receipt_tracker.track(tx_hash)] = (index, job, tx_hash, description)
+        
+        if not queue and not in_flight:
+            break
+        if not in_flight:
+            raise RuntimeError(f"{len(queue)} jobs wait on dependencies that will never land")
+        
+        with metrics.timer("pipeline_wait_seconds"):
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=lambda f: in_flight[f][0]):
+            index, job, tx_hash, description = in_flight.pop(future)
+            try:
+                receipt = future.result()
+            except Exception as e:
+                if is_transaction_dropped(tx_hash):
+                    print(f"⚠️  {description} was dropped, resubmitting with a fresh nonce...")
+                    nonce_manager.invalidate(account.address)
+                    account_state.settle(tx_hash)
+                    queue.appendleft((index, job))
+                else:
+                    print(f"⚠️  Still waiting for {description}: {str(e)[:60]}...")
+                    in_flight[receipt_tracker.track(tx_hash)] = (index, job, tx_hash, description)
                 continue
             
-            if "connection" in error_msg.lower() or "timeout" in error_msg.lower():
-                print("🔄 Connection issue, switching proxy...")
-                if use_proxy:
-                    create_web3_connection(use_proxy, proxy_type)
-                time.sleep(3)
+            if receipt.get("status") == 0:
+                journal.record("submission_abandoned", tx_hash=receipt.transactionHash.to_0x_hex())
+                if gas_estimator.settle(tx_hash, receipt) and index not in regassed:
+                    print(f"⚠️  {description} ran out of gas, resubmitting with a fresh estimate...")
+                    regassed.add(index)
+                    queue.appendleft((index, job))
+                else:
+                    print(f"❌ {description} reverted in block {receipt.blockNumber}")
+                    failed.add(index)
                 continue
             
-            wait_time = min(30, attempt * 2)
-            print(f"🔄 Retrying in {wait_time} seconds...")
-            time.sleep(wait_time)
+            calls_failed = on_receipt(index, receipt, description)
+            if gas_estimator.settle(tx_hash, receipt, calls_failed) and index not in regassed:
+                print(f"⚠️  Calls in {description} ran out of gas, resubmitting them with a fresh estimate...")
+                regassed.add(index)
+                queue.appendleft((index, job))
+            elif calls_failed:
+                failed.add(index)
+            else:
+                landed.add(index)
+    
+    return failed
 
 # ================== AUTOMATED WORKFLOW ==================
+def run_workflow(account, run_id, use_proxy=False, proxy_type="online"):
+    """Deploy and interact for a journal run in one pipeline, returns interactions completed"""
+    contract_count = journal.runs[run_id]["contract_count"]
+    interaction_count = journal.runs[run_id]["interaction_count"]
+    batch_size = journal.runs[run_id]["batch_size"]
+    
+    print("🏗️  DEPLOY & INTERACT")
+    print("=" * 40)
+    print(f"Target: {contract_count * 2} contracts, {interaction_count} interactions")
+    
+    deployed_contracts[:] = journal.run_contracts(run_id)
+    if deployed_contracts:
+        print(f"♻️  {len(deployed_contracts)} contracts already deployed in run #{run_id}")
+    
+    # Compile before anything is submitted, a missing compiler is not an error to retry
+    for contract_type in ("storage", "counter", "batcher") if batch_size else ("storage", "counter"):
+        templates.prepare(contract_type)
+    
+    jobs = []
+    handlers = []  # job index -> handler(receipt, description)
+    depends = {}  # job index -> deploy job indexes it waits for
+    
+    # Deployments: one slot per contract, its address is known as soon as the deploy is submitted
+    def submit_deploy(slot):
+        tx_hash, slot["address"] = deploy_contract_persistent(slot["name"], account, use_proxy, proxy_type)
+        journal.record("deploy_submitted", run=run_id, type=slot["name"], address=slot["address"], tx_hash=tx_hash.to_0x_hex())
+        return tx_hash, CONTRACT_SOURCES[slot["name"]][1]
+    
+    def on_deployed(slot, operation, receipt, description):
+        if receipt.contractAddress != slot["address"]:
+            print(f"⚠️  {operation} landed at {receipt.contractAddress}, not the precomputed {slot['address']}")
+            slot["address"] = receipt.contractAddress
+        journal.record("deploy_confirmed", run=run_id, type=slot["name"], address=receipt.contractAddress,
+                       tx_hash=receipt.transactionHash.to_0x_hex(), block=receipt.blockNumber)
+        if slot["name"] != "batcher":
+            deployed_contracts.append({"name": slot["name"], "address": receipt.contractAddress})
+        report_tx(receipt, operation)
+    
+    def add_slot(contract_type, index, operation):
+        run_deployed = journal.runs[run_id]["deployed"][contract_type]
+        slot = {"name": contract_type, "address": None, "job": None}
+        if index < len(run_deployed):
+            slot["address"] = run_deployed[index]
+        else:
+            slot["job"] = len(jobs)
+            jobs.append(partial(submit_deploy, slot))
+            handlers.append(partial(on_deployed, slot, operation))
+        return slot
+    
+    slots = []
+    for i in range(contract_count):
+        pair_num = i + 1
+        slots.append(add_slot("storage", i, f"Deploy Storage #{pair_num}"))
+        slots.append(add_slot("counter", i, f"Deploy Counter #{pair_num}"))
+    batcher_slot = add_slot("batcher", 0, "Deploy Batcher") if batch_size else None
+    
+    # Interactions: queued now, each submitted once the deploys it targets are included
+    interactions_completed = journal.runs[run_id]["interactions"]
+    interaction_targets = [
+        slots[i % len(slots)]
+        for i in range(interactions_completed, interaction_count if slots else 0)
+    ]
+    
+    def submit_interaction(number, slot):
+        progress = (number / interaction_count) * 100
+        print(f"\n⚡ [{number}/{interaction_count}] ({progress:.1f}%) Interacting with {slot['name']}...")
+        tx_hash, description = interact_contract_persistent(
+            slot['address'],
+            slot['name'],
+            account,
+            use_proxy,
+            proxy_type
+        )
+        journal.record("interaction_submitted", run=run_id, address=slot['address'], tx_hash=tx_hash.to_0x_hex())
+        return tx_hash, description
+    
+    def on_interacted(slot, receipt, description):
+        nonlocal interactions_completed
+        journal.record("interaction_confirmed", run=run_id, address=slot['address'],
+                       tx_hash=receipt.transactionHash.to_0x_hex(), block=receipt.blockNumber)
+        interactions_completed += 1
+        print(f"📝 {description}")
+        report_tx(receipt, f"Interact {slot['name'].title()}", show_balance=(interactions_completed % 10 == 0))
+    
+    # Batched mode: pack up to batch_size interactions into each Batcher transaction
+    batch_descriptions = {}
+    
+    def submit_batch(first_number, targets):
+        last_number = first_number + len(targets) - 1
+        progress = (last_number / interaction_count) * 100
+        print(f"\n⚡ [{first_number}-{last_number}/{interaction_count}] ({progress:.1f}%) Batching {len(targets)} interactions...")
+        tx_hash, descriptions = interact_batch_persistent(batcher_slot["address"], targets, account, use_proxy, proxy_type)
+        journal.record("interaction_submitted", run=run_id, address=batcher_slot["address"],
+                       calls=[slot['address'] for slot in targets], tx_hash=tx_hash.to_0x_hex())
+        batch_descriptions[tx_hash.to_0x_hex()] = descriptions
+        return tx_hash, f"Batch of {len(targets)} interactions"
+    
+    def on_batched(targets, receipt, description):
+        nonlocal interactions_completed
+        descriptions = batch_descriptions.pop(receipt.transactionHash.to_0x_hex())
+        succeeded = batch_call_results(receipt)
+        failed_targets = []
+        for i, slot in enumerate(targets):
+            if succeeded.get(i):
+                journal.record("interaction_confirmed", run=run_id, address=slot['address'],
+                               tx_hash=receipt.transactionHash.to_0x_hex(), block=receipt.blockNumber, index=i)
+                interactions_completed += 1
+                print(f"   ✅ {descriptions[i]} → {slot['address']}")
+            else:
+                print(f"   ❌ {descriptions[i]} → {slot['address']} failed")
+                failed_targets.append(slot)
+        if not any(succeeded.values()):
+            journal.record("submission_abandoned", tx_hash=receipt.transactionHash.to_0x_hex())
+        report_tx(receipt, f"Interact Batch x{len(targets)}")
+        # A resubmitted batch only carries the calls that failed
+        targets[:] = failed_targets
+        return bool(failed_targets)
+    
+    if batch_size:
+        for i in range(0, len(interaction_targets), batch_size):
+            targets = interaction_targets[i:i + batch_size]
+            depends[len(jobs)] = {slot["job"] for slot in targets + [batcher_slot] if slot["job"] is not None}
+            jobs.append(partial(submit_batch, interactions_completed + i + 1, targets))
+            handlers.append(partial(on_batched, targets))
+    else:
+        for i, slot in enumerate(interaction_targets):
+            if slot["job"] is not None:
+                depends[len(jobs)] = {slot["job"]}
+            jobs.append(partial(submit_interaction, interactions_completed + i + 1, slot))
+            handlers.append(partial(on_interacted, slot))
+    
+    failed = set()
+    try:
+        failed = pipeline_transactions(jobs, account, lambda index, receipt, description: handlers[index](receipt, description), depends=depends)
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Workflow interrupted by user at {interactions_completed}/{interaction_count} interactions")
+    
+    # Final Summary
+    print(f"\n🎉 WORKFLOW COMPLETED!")
+    print("=" * 40)
+    print(f"✅ Contracts Deployed: {len(deployed_contracts)}")
+    print(f"✅ Interactions Completed: {interactions_completed}/{interaction_count}")
+    
+    confirmed, avg_latency, max_latency = receipt_tracker.summary()
+    if confirmed:
+        print(f"⏱️  Confirmation latency: avg {avg_latency:.1f}s, max {max_latency:.1f}s over {confirmed} txs")
+    print(f"📡 RPC: {rpc.calls} calls in {rpc.round_trips} round-trips ({rpc.saved()} saved)")
+    backoff = metrics.total_seconds("backoff_seconds")
+    if backoff:
+        print(f"⏳ Backoff: {backoff:.1f}s spent waiting on retries")
+    if failed:
+        print(f"❌ Gave up on {len(failed)} submissions, resume the run to retry them")
+    try:
+        print(f"📈 Metrics written to {metrics.dump()}")
+    except Exception as e:
+        print(f"⚠️  Could not write metrics: {e}")
+    
+    if interactions_completed >= interaction_count:
+        print("🏆 All targets achieved successfully!")
+    else:
+        print(f"⚠️  Partial completion: {interactions_completed}/{interaction_count} interactions")
+    
+    return interactions_completed
+
 def automated_workflow():
     """Complete automated workflow: Deploy + Interact"""
     clear()
@@ -495,10 +1986,6 @@ def automated_workflow():
     print("=" * 60)
     
     try:
-        # Get user inputs
-        contract_count = int(input("🏗️  How many contract pairs to deploy? "))
-        interaction_count = int(input("⚡ How many interactions to perform? "))
-        
         print("\n📡 Connection Options:")
         print("1. Direct connection (no proxy)")
         print("2. Use proxy")
@@ -514,105 +2001,58 @@ def automated_workflow():
             proxy_choice = input("Select (1-2): ").strip()
             proxy_type = "online" if proxy_choice == "1" else "local"
         
+        if METRICS_PORT:
+            metrics.serve(METRICS_PORT)
+        
         # Establish initial connection
         print("\n🔌 Establishing connection...")
         if not create_web3_connection(use_proxy, proxy_type):
             print("❌ Failed to establish initial connection")
             return
         
+        # Settle whatever the last session left in flight
+        journal.verify()
+        
+        # Offer to resume an interrupted run, judged on the verified journal
+        resume_run = None
+        last_run = journal.last_run()
+        if last_run and not journal.is_complete(last_run["run"]):
+            deployed = len(journal.run_contracts(last_run["run"]))
+            print(f"♻️  Unfinished run #{last_run['run']}: {deployed}/{last_run['contract_count'] * 2} contracts, "
+                  f"{last_run['interactions']}/{last_run['interaction_count']} interactions")
+            if input("Resume it? (y/n): ").strip().lower() == "y":
+                resume_run = last_run
+        
+        # Get user inputs
+        if resume_run:
+            contract_count = resume_run["contract_count"]
+            interaction_count = resume_run["interaction_count"]
+            batch_size = resume_run["batch_size"]
+        else:
+            contract_count = int(input("🏗️  How many contract pairs to deploy? "))
+            interaction_count = int(input("⚡ How many interactions to perform? "))
+            
+            print("\n⚙️  Interaction Mode:")
+            print("1. One transaction per interaction")
+            print(f"2. Batched ({BATCH_SIZE} interactions per transaction via a Batcher contract)")
+            batch_size = BATCH_SIZE if input("Select (1-2): ").strip() == "2" else 0
+        
+        run_id = resume_run["run"] if resume_run else journal.start_run(contract_count, interaction_count, batch_size)
+        
         private_keys = load_accounts()
         account = w3.eth.account.from_key(private_keys[0])
         
         print(f"\n🚀 Starting automated workflow:")
         print(f"   📦 {contract_count} contract pairs to deploy")
         print(f"   ⚡ {interaction_count} interactions to perform")
+        if batch_size:
+            print(f"   📦 Batched mode: up to {batch_size} interactions per transaction")
         print(f"   📍 Account: {account.address}")
         
         input("\n📌 Press Enter to start...")
         clear()
         
-        # Phase 1: Deployment
-        print("🏗️  PHASE 1: CONTRACT DEPLOYMENT")
-        print("=" * 40)
-        
-        deployed_contracts.clear()  # Reset
-        
-        for i in range(contract_count):
-            pair_num = i + 1
-            print(f"\n📦 Deploying contract pair {pair_num}/{contract_count}")
-            
-            # Deploy Storage
-            print(f"   🏗️  [{pair_num}.1] Deploying Storage contract...")
-            try:
-                storage_abi, storage_bin = compile_contract(STORAGE_SOURCE, "Storage")
-                receipt = deploy_contract_persistent(storage_abi, storage_bin, account, "Storage", use_proxy, proxy_type)
-                deployed_contracts.append({"name": "storage", "address": receipt.contractAddress})
-                report_tx(receipt, f"Deploy Storage #{pair_num}")
-            except KeyboardInterrupt:
-                print("\n⚠️  Deployment interrupted by user")
-                return
-            
-            # Deploy Counter
-            print(f"   🏗️  [{pair_num}.2] Deploying Counter contract...")
-            try:
-                counter_abi, counter_bin = compile_contract(COUNTER_SOURCE, "Counter")
-                receipt = deploy_contract_persistent(counter_abi, counter_bin, account, "Counter", use_proxy, proxy_type)
-                deployed_contracts.append({"name": "counter", "address": receipt.contractAddress})
-                report_tx(receipt, f"Deploy Counter #{pair_num}")
-            except KeyboardInterrupt:
-                print("\n⚠️  Deployment interrupted by user")
-                return
-            
-            # Small delay between pairs
-            time.sleep(random.uniform(1, 3))
-        
-        print(f"\n✅ DEPLOYMENT COMPLETED: {len(deployed_contracts)} contracts deployed")
-        
-        # Phase 2: Interactions
-        print(f"\n⚡ PHASE 2: CONTRACT INTERACTIONS")
-        print("=" * 40)
-        print(f"Target: {interaction_count} interactions")
-        
-        interactions_completed = 0
-        
-        while interactions_completed < interaction_count:
-            try:
-                for contract_info in deployed_contracts:
-                    if interactions_completed >= interaction_count:
-                        break
-                    
-                    interactions_completed += 1
-                    progress = (interactions_completed / interaction_count) * 100
-                    
-                    print(f"\n⚡ [{interactions_completed}/{interaction_count}] ({progress:.1f}%) Interacting with {contract_info['name']}...")
-                    
-                    receipt = interact_contract_persistent(
-                        contract_info['address'],
-                        contract_info['name'],
-                        account,
-                        use_proxy,
-                        proxy_type
-                    )
-                    
-                    report_tx(receipt, f"Interact {contract_info['name'].title()}", show_balance=(interactions_completed % 10 == 0))
-                    
-                    # Small delay
-                    time.sleep(random.uniform(0.5, 2))
-                    
-            except KeyboardInterrupt:
-                print(f"\n⚠️  Interactions interrupted by user at {interactions_completed}/{interaction_count}")
-                break
-        
-        # Final Summary
-        print(f"\n🎉 WORKFLOW COMPLETED!")
-        print("=" * 40)
-        print(f"✅ Contracts Deployed: {len(deployed_contracts)}")
-        print(f"✅ Interactions Completed: {interactions_completed}/{interaction_count}")
-        
-        if interactions_completed >= interaction_count:
-            print("🏆 All targets achieved successfully!")
-        else:
-            print(f"⚠️  Partial completion: {interactions_completed}/{interaction_count} interactions")
+        run_workflow(account, run_id, use_proxy, proxy_type)
         
     except KeyboardInterrupt:
         print("\n\n👋 Workflow interrupted by user")
@@ -623,15 +2063,16 @@ def automated_workflow():
 def show_status():
     """Show current status"""
     try:
+        if not w3:
+            print("❌ No active connection")
+            return
+        
         private_keys = load_accounts()
         account = w3.eth.account.from_key(private_keys[0])
         
-        if not w3 or not w3.is_connected():
-            print("❌ No active connection")
-            return
-            
-        balance = get_balance(account.address)
-        tx_count = get_nonce(account.address)
+        # Balance and nonces in a single round-trip
+        state = account_state.get(account.address)
+        balance, tx_count = state["balance"], state["pending_nonce"]
         
         print("┌─────────────────────────────────────┐")
         print("│           ACCOUNT STATUS            │")
@@ -678,6 +2119,12 @@ def main():
         print("🔥 Enhanced with Persistent Retry & Auto Proxy Switching")
         print("=" * 60)
         
+        # Restore contracts from the last run; they are checked on-chain once connected
+        journal.load()
+        last_run = journal.last_run()
+        if last_run:
+            deployed_contracts = journal.run_contracts(last_run["run"])
+        
         while True:
             print("\n┌─────────────────────────────────────┐")
             print("│              MAIN MENU              │")